@@ -0,0 +1,81 @@
+"""Measure backend startup time.
+
+Reports how long a fresh interpreter takes to import main.py, and how long
+a uvicorn server takes from launch until /health/ready answers.
+
+Usage (from the backend directory):
+    python benchmark_startup.py [--runs 5] [--port 8765]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+READY_TARGET_SECONDS = 1.0
+
+
+def measure_import() -> float:
+    """Time `import main` in a fresh interpreter"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import main"],
+        cwd=BACKEND_DIR,
+        check=True,
+        env={**os.environ, "PREWARM_IMPORTS": "false"},
+    )
+    return time.perf_counter() - start
+
+
+def measure_ready(port: int, timeout: float = 30.0) -> float:
+    """Time from launching uvicorn until the readiness probe returns 200"""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health/ready"
+        while time.perf_counter() - start < timeout:
+            try:
+                if requests.get(url, timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"Server was not ready after {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(label: str, timings) -> None:
+    print(f"{label}: median {statistics.median(timings):.3f}s, "
+          f"min {min(timings):.3f}s, max {max(timings):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    import_timings = [measure_import() for _ in range(args.runs)]
+    ready_timings = [measure_ready(args.port) for _ in range(args.runs)]
+
+    summarize("Import main.py   ", import_timings)
+    summarize("Launch to ready  ", ready_timings)
+
+    if statistics.median(ready_timings) > READY_TARGET_SECONDS:
+        print(f"❌ Median time to ready exceeds {READY_TARGET_SECONDS:.1f}s target")
+        sys.exit(1)
+    print(f"✅ Median time to ready within {READY_TARGET_SECONDS:.1f}s target")
+
+
+if __name__ == "__main__":
+    main()
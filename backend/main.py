@@ -1,31 +1,44 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import contextlib
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import os
 from datetime import datetime
 from dotenv import load_dotenv
 import openai
-from sklearn.metrics.pairwise import cosine_similarity
 import requests
 import re
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
 import io
+import csv
+import hashlib
+import importlib
+import json
+import shutil
 import tempfile
+import textwrap
+import threading
+import time
+from collections import OrderedDict, deque
 
-# Document processing imports
-import PyPDF2
-from docx import Document
-from bs4 import BeautifulSoup
-import pytesseract
-from PIL import Image
-from pdf2image import convert_from_bytes
+# Heavy libraries (Google discovery client, numpy, document extractors, OCR)
+# are imported inside the functions that use them so the server can start
+# accepting requests immediately. See prewarm_imports() below.
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Talk to a Folder API")
+STARTED_AT = time.monotonic()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=prewarm_imports, name="prewarm-imports", daemon=True).start()
+    conversation_store.start_disk_worker()
+    yield
+
+app = FastAPI(title="Talk to a Folder API", lifespan=lifespan)
 
 # OpenAI Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4o-mini")
@@ -44,12 +57,300 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Spreadsheet chunking configuration
+SPREADSHEET_ROWS_PER_CHUNK = 50  # Max data rows in a single row-group chunk
+SPREADSHEET_CHUNK_CHARS = 2000   # Max characters of header plus row text in a single row-group chunk
+
+XLSX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PPTX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+# Modules every chat/index request needs. They are imported in the background
+# right after startup, and /health/ready reports not ready until they are
+# loaded, so request handlers never block the event loop on these imports.
+CORE_MODULES = [
+    "numpy",
+    "googleapiclient.discovery",
+    "googleapiclient.http",
+    "google.oauth2.credentials",
+]
+
+# Document extractor modules, prewarmed after the core modules so the first
+# file of each type doesn't pay the import cost
+PREWARM_IMPORTS = os.getenv("PREWARM_IMPORTS", "true").lower() == "true"
+PREWARM_MODULES = [
+    "PyPDF2",
+    "docx",
+    "bs4",
+    "openpyxl",
+    "pptx",
+    "pytesseract",
+    "pdf2image",
+]
+prewarm_status = {"started": False, "core_ready": False, "completed": False, "loaded": [], "failed": {}}
+
+# Conversation history configuration
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "10"))          # Recent messages kept verbatim
+HISTORY_SUMMARY_BATCH = int(os.getenv("HISTORY_SUMMARY_BATCH", "6"))         # Older messages folded into the summary at once
+HISTORY_SUMMARY_MAX_CHARS = int(os.getenv("HISTORY_SUMMARY_MAX_CHARS", "2000"))
+HISTORY_MAX_CONVERSATIONS = int(os.getenv("HISTORY_MAX_CONVERSATIONS", "5000"))  # Conversations held in memory
+HISTORY_IDLE_TTL_SECONDS = int(os.getenv("HISTORY_IDLE_TTL_SECONDS", "1800"))
+HISTORY_DISK_DIR = os.getenv("HISTORY_DISK_DIR", "")  # Empty disables the on-disk tier
+HISTORY_DISK_TTL_SECONDS = int(os.getenv("HISTORY_DISK_TTL_SECONDS", "604800"))
+DEFAULT_SESSION_ID = "default"  # Used when a client doesn't send a session_id
+
+class Conversation:
+    """Recent messages in a ring buffer plus a rolling summary of older turns"""
+    __slots__ = ("messages", "pending", "summary", "last_active", "summarizing")
+
+    def __init__(self, messages=(), pending=(), summary: str = "", last_active: float = None):
+        self.messages = deque(messages, maxlen=HISTORY_MAX_MESSAGES)
+        self.pending = list(pending)  # Messages pushed out of the buffer, waiting to be summarized
+        self.summary = summary
+        self.last_active = last_active or time.time()
+        self.summarizing = False  # A background summary is folding in pending messages
+
+    def append(self, role: str, content: str):
+        if len(self.messages) == self.messages.maxlen:
+            self.pending.append(self.messages[0])
+        self.messages.append({"role": role, "content": content})
+        self.last_active = time.time()
+
+    def needs_summary(self) -> bool:
+        return not self.summarizing and len(self.pending) >= HISTORY_SUMMARY_BATCH
+
+    def to_dict(self) -> Dict:
+        return {
+            "messages": list(self.messages),
+            "pending": self.pending,
+            "summary": self.summary,
+            "last_active": self.last_active,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Conversation":
+        return cls(data["messages"], data["pending"], data["summary"], data["last_active"])
+
+class ConversationStore:
+    """Conversation histories keyed by (job_id, user_id, session_id).
+
+    At most max_conversations are kept in memory in least-recently-used
+    order. Conversations idle for longer than idle_ttl, or pushed out by
+    newer ones, are written to disk_dir when it is set and dropped
+    otherwise. Disk writes and expiry of files older than disk_ttl happen
+    in a background thread started with start_disk_worker(), so requests
+    only move evicted conversations onto a queue.
+    """
+
+    def __init__(self, max_conversations: int, idle_ttl: int, disk_dir: str = "",
+                 disk_ttl: int = 0, sweep_interval: int = 60):
+        self.max_conversations = max_conversations
+        self.idle_ttl = idle_ttl
+        self.disk_dir = disk_dir
+        self.disk_ttl = disk_ttl
+        self.sweep_interval = sweep_interval
+        self._conversations = OrderedDict()
+        self._last_sweep = time.monotonic()
+        # Evicted conversations waiting to be written to disk. They can be
+        # reclaimed by get() until the disk worker has written them.
+        self._spilling = OrderedDict()
+        self._spill_lock = threading.Lock()
+        self._spill_ready = threading.Event()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def get(self, key: tuple, create: bool = True) -> Optional[Conversation]:
+        self._sweep()
+
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._reclaim(key)
+            if conversation is None:
+                if not create:
+                    return None
+                conversation = Conversation()
+            self.put(key, conversation)
+        else:
+            self._conversations.move_to_end(key)
+
+        conversation.last_active = time.time()
+        return conversation
+
+    def put(self, key: tuple, conversation: Conversation):
+        self._conversations[key] = conversation
+        self._conversations.move_to_end(key)
+
+        while len(self._conversations) > self.max_conversations:
+            self._evict(*self._conversations.popitem(last=False))
+
+    def delete(self, key: tuple) -> bool:
+        found = self._conversations.pop(key, None) is not None
+        if self.disk_dir:
+            with self._spill_lock:
+                found = self._spilling.pop(key, None) is not None or found
+                try:
+                    os.remove(self._disk_path(key))
+                    found = True
+                except FileNotFoundError:
+                    pass
+        return found
+
+    def delete_user(self, job_id: str, user_id: str) -> int:
+        """Delete every session a user has for a job"""
+        keys = [key for key in self._conversations if key[:2] == (job_id, user_id)]
+        for key in keys:
+            del self._conversations[key]
+
+        deleted = len(keys)
+        if self.disk_dir:
+            with self._spill_lock:
+                spilling = [key for key in self._spilling if key[:2] == (job_id, user_id)]
+                for key in spilling:
+                    del self._spilling[key]
+                deleted += len(spilling)
+
+                user_dir = self._user_dir(job_id, user_id)
+                if os.path.isdir(user_dir):
+                    deleted += len(os.listdir(user_dir))
+                    shutil.rmtree(user_dir, ignore_errors=True)
+        return deleted
+
+    def start_disk_worker(self, cleanup_interval: int = 300):
+        """Write evicted conversations and remove expired files in a daemon thread"""
+        if not self.disk_dir:
+            return
+
+        def run():
+            next_cleanup = time.monotonic() + cleanup_interval
+            while True:
+                self._spill_ready.wait(timeout=max(0, next_cleanup - time.monotonic()))
+                self._spill_ready.clear()
+                self.flush_spills()
+                if self.disk_ttl and time.monotonic() >= next_cleanup:
+                    self.cleanup_disk()
+                    next_cleanup = time.monotonic() + cleanup_interval
+
+        threading.Thread(target=run, name="history-disk", daemon=True).start()
+
+    def flush_spills(self) -> int:
+        """Write queued evicted conversations to disk"""
+        written = 0
+        while True:
+            # Hold the lock for one write at a time so get() never waits long
+            with self._spill_lock:
+                if not self._spilling:
+                    return written
+                key, conversation = self._spilling.popitem(last=False)
+                self._write(key, conversation)
+                written += 1
+
+    def cleanup_disk(self) -> int:
+        """Remove files older than disk_ttl, and directories left empty"""
+        removed = 0
+        cutoff = time.time() - self.disk_ttl
+        for root, dirs, files in os.walk(self.disk_dir, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+            for name in dirs:
+                # Only succeeds for directories that are now empty
+                with contextlib.suppress(OSError):
+                    os.rmdir(os.path.join(root, name))
+        return removed
+
+    def _user_dir(self, job_id: str, user_id: str) -> str:
+        # Hash identifiers so client-supplied ids can't escape the history directory
+        return os.path.join(
+            self.disk_dir,
+            hashlib.sha256(job_id.encode()).hexdigest(),
+            hashlib.sha256(user_id.encode()).hexdigest(),
+        )
+
+    def _disk_path(self, key: tuple) -> str:
+        job_id, user_id, session_id = key
+        return os.path.join(self._user_dir(job_id, user_id), hashlib.sha256(session_id.encode()).hexdigest() + ".json")
+
+    def _evict(self, key: tuple, conversation: Conversation):
+        """Queue an evicted conversation for the disk worker, or drop it without a disk tier"""
+        if not self.disk_dir:
+            return
+        with self._spill_lock:
+            self._spilling[key] = conversation
+        self._spill_ready.set()
+
+    def _write(self, key: tuple, conversation: Conversation):
+        try:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename it so a crash never leaves a partial file
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+                json.dump(conversation.to_dict(), f)
+            os.replace(f.name, path)
+        except Exception as e:
+            print(f"❌ Could not write conversation history to disk: {e}")
+
+    def _reclaim(self, key: tuple) -> Optional[Conversation]:
+        """Take a conversation back from the spill queue or the disk tier"""
+        if not self.disk_dir:
+            return None
+        with self._spill_lock:
+            conversation = self._spilling.pop(key, None)
+            if conversation is not None:
+                return conversation
+            return self._load(key)
+
+    def _load(self, key: tuple) -> Optional[Conversation]:
+        path = self._disk_path(key)
+        try:
+            with open(path) as f:
+                content = f.read()
+        except OSError:
+            return None
+        # The conversation moves back to memory, and unreadable files are
+        # discarded rather than failing every later access
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+        try:
+            return Conversation.from_dict(json.loads(content))
+        except Exception as e:
+            print(f"❌ Discarding unreadable conversation history file: {e}")
+            return None
+
+    def _sweep(self):
+        """Evict idle conversations from memory, at most once per sweep_interval"""
+        if time.monotonic() - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = time.monotonic()
+
+        # Entries are in least-recently-used order, so stop at the first active one
+        cutoff = time.time() - self.idle_ttl
+        while self._conversations:
+            key, conversation = next(iter(self._conversations.items()))
+            if conversation.last_active > cutoff:
+                break
+            del self._conversations[key]
+            self._evict(key, conversation)
+
 # Temporary in-memory storage for MVP
 sessions = {}
 folder_data = {}
 document_store = {}  # Store document chunks and embeddings
 embeddings_cache = {}  # Cache for document embeddings
-conversation_history = {}  # Store conversation history for each job_id
+conversation_store = ConversationStore(
+    max_conversations=HISTORY_MAX_CONVERSATIONS,
+    idle_ttl=HISTORY_IDLE_TTL_SECONDS,
+    disk_dir=HISTORY_DISK_DIR,
+    disk_ttl=HISTORY_DISK_TTL_SECONDS,
+)
 
 class AuthRequest(BaseModel):
     access_token: str
@@ -63,6 +364,7 @@ class ChatRequest(BaseModel):
     access_token: str
     message: str
     job_id: str
+    session_id: Optional[str] = None
 
 class AuthResponse(BaseModel):
     session_id: str
@@ -113,23 +415,23 @@ async def find_relevant_chunks(query: str, job_id: str, top_k: int = 3) -> List[
     if not query_embedding:
         return []
     
-    # Calculate similarities
-    chunks_data = document_store[job_id]
-    similarities = []
+    import numpy as np
     
-    for chunk_data in chunks_data:
-        if chunk_data.get("embedding"):
-            similarity = cosine_similarity(
-                [query_embedding], 
-                [chunk_data["embedding"]]
-            )[0][0]
-            similarities.append((similarity, chunk_data))
+    # Calculate cosine similarities against all embedded chunks at once
+    chunks_data = [chunk for chunk in document_store[job_id] if chunk.get("embedding")]
+    if not chunks_data:
+        return []
+    
+    matrix = np.array([chunk["embedding"] for chunk in chunks_data])
+    query_vector = np.array(query_embedding)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    similarities = matrix @ query_vector / np.where(norms == 0, 1, norms)
     
     # Sort by similarity and return top_k
-    similarities.sort(key=lambda x: x[0], reverse=True)
-    return [data for _, data in similarities[:top_k]]
+    top_indices = np.argsort(similarities)[::-1][:top_k]
+    return [chunks_data[i] for i in top_indices]
 
-async def generate_answer(query: str, context_chunks: List[Dict], conversation_history: List[Dict] = None) -> str:
+async def generate_answer(query: str, context_chunks: List[Dict], conversation: Optional[Conversation] = None) -> str:
     """Generate answer using OpenAI with context and conversation history"""
     try:
         # Prepare context from documents
@@ -153,10 +455,15 @@ Instructions:
 - Be conversational and helpful"""}
         ]
         
-        # Add conversation history (last 10 messages, excluding current user message)
-        if conversation_history:
-            # Get last 10 messages but exclude the current user message that was just added
-            history_to_include = conversation_history[:-1][-10:] if len(conversation_history) > 1 else []
+        # Add conversation history: a summary of older turns, then recent messages verbatim.
+        # Both are bounded, so the prompt size stays stable however long the conversation runs.
+        if conversation:
+            if conversation.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{conversation.summary}"
+                })
+            history_to_include = conversation.pending + list(conversation.messages)
             print(f"🧠 Including {len(history_to_include)} previous messages in context")
             for msg in history_to_include:
                 messages.append({
@@ -180,6 +487,38 @@ Instructions:
         print(f"Error generating answer: {e}")
         return f"I apologize, but I encountered an error while processing your question: {str(e)}"
 
+def summarize_conversation(conversation: Conversation):
+    """Fold messages pushed out of the ring buffer into the rolling summary.
+
+    Runs as a background task after the chat response is sent. Pending
+    messages keep being sent verbatim until they are folded in, and messages
+    that arrive while the summary is generated stay pending for the next batch.
+    """
+    try:
+        batch = conversation.pending[:]
+        transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in batch)
+        
+        try:
+            response = openai.ChatCompletion.create(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": "You maintain a compact memory of a conversation about documents in a Google Drive folder. Merge the new messages into the existing summary. Keep facts, names, decisions and open questions; drop pleasantries. Reply with the updated summary only."},
+                    {"role": "user", "content": f"Existing summary:\n{conversation.summary or '(none)'}\n\nNew messages:\n{transcript}"}
+                ],
+                max_tokens=300,
+                temperature=0
+            )
+            summary = response['choices'][0]['message']['content'].strip()
+        except Exception as e:
+            print(f"Error summarizing conversation: {e}")
+            # Fall back to keeping the raw text, trimmed to the newest part below
+            summary = f"{conversation.summary}\n{transcript}".strip()
+        
+        conversation.summary = summary[-HISTORY_SUMMARY_MAX_CHARS:]
+        del conversation.pending[:len(batch)]
+    finally:
+        conversation.summarizing = False
+
 # Google API helper functions
 def validate_google_token(access_token: str) -> Dict:
     """Validate Google access token and get user info"""
@@ -226,6 +565,9 @@ def extract_folder_id(folder_url: str) -> str:
 
 def get_drive_service(access_token: str):
     """Create Google Drive API service"""
+    from googleapiclient.discovery import build
+    from google.oauth2.credentials import Credentials
+    
     credentials = Credentials(token=access_token)
     return build('drive', 'v3', credentials=credentials)
 
@@ -233,6 +575,8 @@ def get_drive_service(access_token: str):
 def extract_text_from_pdf(pdf_content: bytes) -> str:
     """Extract text from PDF with fallback to OCR for non-machine readable PDFs"""
     try:
+        import PyPDF2
+        
         # First, try standard text extraction
         pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
         text = ""
@@ -257,6 +601,9 @@ def extract_text_from_pdf(pdf_content: bytes) -> str:
 def extract_text_from_pdf_ocr(pdf_content: bytes) -> str:
     """Extract text from PDF using OCR"""
     try:
+        import pytesseract
+        from pdf2image import convert_from_bytes
+        
         # Convert PDF pages to images
         images = convert_from_bytes(pdf_content)
         
@@ -278,6 +625,8 @@ def extract_text_from_pdf_ocr(pdf_content: bytes) -> str:
 def extract_text_from_docx(docx_content: bytes) -> str:
     """Extract text from DOCX file"""
     try:
+        from docx import Document
+        
         doc = Document(io.BytesIO(docx_content))
         text = ""
         
@@ -301,6 +650,8 @@ def extract_text_from_docx(docx_content: bytes) -> str:
 def extract_text_from_html(html_content: bytes) -> str:
     """Extract text from HTML file"""
     try:
+        from bs4 import BeautifulSoup
+        
         # Decode bytes to string
         html_text = html_content.decode('utf-8', errors='ignore')
         
@@ -326,6 +677,158 @@ def extract_text_from_html(html_content: bytes) -> str:
         print(f"❌ HTML extraction failed: {e}")
         return f"[HTML extraction failed: {str(e)}]"
 
+def format_row(row) -> str:
+    """Format a spreadsheet row as a pipe-separated line, dropping trailing empty cells"""
+    cells = ["" if cell is None else str(cell).strip() for cell in row]
+    while cells and not cells[-1]:
+        cells.pop()
+    return " | ".join(cells)
+
+def chunk_rows(rows, source_label: str) -> List[str]:
+    """Group spreadsheet rows into chunks that each repeat the header row.
+
+    The first non-empty row is treated as the header. Rows are consumed
+    one at a time, so only the chunk being built is held in memory.
+    """
+    chunks = []
+    header = None
+    group = []
+    group_chars = 0
+    first_row = last_row = 0
+
+    def flush():
+        if group:
+            chunks.append(
+                f"{source_label} (rows {first_row}-{last_row})\n"
+                f"Columns: {header}\n" + "\n".join(group)
+            )
+
+    for row_number, row in enumerate(rows, start=1):
+        line = format_row(row)
+        if not line.replace("|", "").strip():
+            continue
+        if header is None:
+            # The header is repeated in every chunk, so very wide sheets get a
+            # truncated header to leave at least half of each chunk for rows
+            header = textwrap.shorten(line, SPREADSHEET_CHUNK_CHARS // 2, placeholder=" ...")
+            row_budget = SPREADSHEET_CHUNK_CHARS - len(header)
+            continue
+
+        # Rows longer than a whole chunk are split so no chunk exceeds the limit
+        pieces = textwrap.wrap(line, row_budget) if len(line) > row_budget else [line]
+        for piece in pieces:
+            if group and (len(group) >= SPREADSHEET_ROWS_PER_CHUNK
+                          or group_chars + len(piece) > row_budget):
+                flush()
+                group = []
+                group_chars = 0
+
+            if not group:
+                first_row = row_number
+            group.append(piece)
+            group_chars += len(piece) + 1
+            last_row = row_number
+
+    flush()
+
+    # A sheet with only a header row still carries useful information
+    if not chunks and header is not None:
+        chunks.append(f"{source_label}\nColumns: {header}")
+
+    return chunks
+
+def extract_chunks_from_xlsx(xlsx_path: str) -> List[str]:
+    """Extract row-group chunks from every sheet of an XLSX file"""
+    try:
+        from openpyxl import load_workbook
+        
+        # read_only mode streams rows from disk instead of loading the whole workbook
+        workbook = load_workbook(xlsx_path, read_only=True, data_only=True)
+        chunks = []
+        try:
+            for sheet in workbook.worksheets:
+                sheet_chunks = chunk_rows(sheet.iter_rows(values_only=True), f"Sheet: {sheet.title}")
+                print(f"📊 Sheet '{sheet.title}' produced {len(sheet_chunks)} chunks")
+                chunks.extend(sheet_chunks)
+        finally:
+            workbook.close()
+
+        print(f"✅ XLSX extraction successful ({len(chunks)} chunks)")
+        return chunks
+
+    except Exception as e:
+        print(f"❌ XLSX extraction failed: {e}")
+        return []
+
+def extract_chunks_from_csv(csv_path: str) -> List[str]:
+    """Extract row-group chunks from a CSV file"""
+    try:
+        # utf-8-sig strips the byte order mark Excel writes at the start of CSVs
+        with open(csv_path, newline='', encoding='utf-8-sig', errors='ignore') as csv_file:
+            chunks = chunk_rows(csv.reader(csv_file), "Table")
+
+        print(f"✅ CSV extraction successful ({len(chunks)} chunks)")
+        return chunks
+
+    except Exception as e:
+        print(f"❌ CSV extraction failed: {e}")
+        return []
+
+def extract_shape_text(shapes) -> List[str]:
+    """Collect text from slide shapes, descending into grouped shapes"""
+    from pptx.shapes.group import GroupShape
+    
+    lines = []
+    for shape in shapes:
+        # isinstance rather than shape.shape_type, which raises for shapes
+        # with unrecognized geometry
+        if isinstance(shape, GroupShape):
+            lines.extend(extract_shape_text(shape.shapes))
+            continue
+        if shape.has_text_frame:
+            text = shape.text_frame.text.strip()
+            if text:
+                lines.append(text)
+        if shape.has_table:
+            for row in shape.table.rows:
+                line = format_row(cell.text for cell in row.cells)
+                if line:
+                    lines.append(line)
+    return lines
+
+def extract_chunks_from_pptx(pptx_path: str) -> List[str]:
+    """Extract text from a PPTX file, one chunk per slide"""
+    try:
+        from pptx import Presentation
+        
+        presentation = Presentation(pptx_path)
+        chunks = []
+
+        for slide_number, slide in enumerate(presentation.slides, start=1):
+            lines = extract_shape_text(slide.shapes)
+
+            if slide.has_notes_slide:
+                notes = slide.notes_slide.notes_text_frame.text.strip()
+                if notes:
+                    lines.append(f"Notes: {notes}")
+
+            if not lines:
+                continue
+
+            # Keep line breaks between shapes, table rows and notes; only very
+            # long slides are split further so chunks stay retrievable
+            slide_text = "\n".join(lines)
+            parts = chunk_text(slide_text) if len(slide_text.split()) > 500 else [slide_text]
+            for part in parts:
+                chunks.append(f"Slide {slide_number}: {part}")
+
+        print(f"✅ PPTX extraction successful ({len(chunks)} chunks)")
+        return chunks
+
+    except Exception as e:
+        print(f"❌ PPTX extraction failed: {e}")
+        return []
+
 async def fetch_folder_files(access_token: str, folder_id: str) -> List[Dict]:
     """Fetch files from Google Drive folder"""
     try:
@@ -372,9 +875,6 @@ async def fetch_folder_files(access_token: str, folder_id: str) -> List[Dict]:
             'application/vnd.openxmlformats-officedocument.wordprocessingml.document',  # DOCX
             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',         # XLSX
             'application/vnd.openxmlformats-officedocument.presentationml.presentation', # PPTX
-            'application/msword',           # Legacy DOC
-            'application/vnd.ms-excel',     # Legacy XLS
-            'application/vnd.ms-powerpoint', # Legacy PPT
             
             # Google Workspace documents
             'application/vnd.google-apps.document',     # Google Docs
@@ -449,13 +949,6 @@ async def download_file_content(access_token: str, file_id: str, mime_type: str)
             content = service.files().get_media(fileId=file_id).execute()
             return extract_text_from_html(content)
         
-        elif mime_type == 'text/csv':
-            # Download CSV file
-            content = service.files().get_media(fileId=file_id).execute()
-            text = content.decode('utf-8', errors='ignore')
-            print(f"✅ CSV file processed ({len(text)} characters)")
-            return text
-        
         elif mime_type == 'application/rtf':
             # Download RTF file (basic text extraction)
             content = service.files().get_media(fileId=file_id).execute()
@@ -463,26 +956,6 @@ async def download_file_content(access_token: str, file_id: str, mime_type: str)
             print(f"✅ RTF file processed ({len(text)} characters)")
             return text
         
-        elif mime_type == 'application/vnd.google-apps.spreadsheet':
-            # Export Google Sheets as CSV
-            content = service.files().export(
-                fileId=file_id, 
-                mimeType='text/csv'
-            ).execute()
-            text = content.decode('utf-8')
-            print(f"✅ Google Sheets processed ({len(text)} characters)")
-            return text
-        
-        elif mime_type == 'application/vnd.google-apps.presentation':
-            # Export Google Slides as plain text
-            content = service.files().export(
-                fileId=file_id, 
-                mimeType='text/plain'
-            ).execute()
-            text = content.decode('utf-8')
-            print(f"✅ Google Slides processed ({len(text)} characters)")
-            return text
-        
         else:
             print(f"⚠️ Unsupported file type: {mime_type}")
             return f"[File type {mime_type} not yet supported for text extraction]"
@@ -491,10 +964,136 @@ async def download_file_content(access_token: str, file_id: str, mime_type: str)
         print(f"❌ Error downloading file {file_id}: {e}")
         return f"[Error reading file: {str(e)}]"
 
+def download_to_tempfile(media_request, suffix: str) -> str:
+    """Stream a Drive media request to a temporary file and return its path"""
+    from googleapiclient.http import MediaIoBaseDownload
+    
+    temp_file = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        downloader = MediaIoBaseDownload(temp_file, media_request)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+    except Exception:
+        temp_file.close()
+        os.remove(temp_file.name)
+        raise
+    temp_file.close()
+    return temp_file.name
+
+def download_and_extract(media_request, extractor, suffix: str) -> List[str]:
+    """Stream a Drive media request to disk and run a file-based extractor on it"""
+    path = download_to_tempfile(media_request, suffix)
+    try:
+        return extractor(path)
+    finally:
+        os.remove(path)
+
+async def extract_file_chunks(access_token: str, file_id: str, mime_type: str) -> List[str]:
+    """Download a file and split its content into chunks ready for embedding.
+
+    Spreadsheets and presentations are streamed to disk and chunked by
+    row group or slide; everything else goes through plain text chunking.
+    """
+    if mime_type in ['text/csv', XLSX_MIME_TYPE, 'application/vnd.google-apps.spreadsheet']:
+        extractor, suffix = extract_chunks_from_xlsx, '.xlsx'
+        if mime_type == 'text/csv':
+            extractor, suffix = extract_chunks_from_csv, '.csv'
+    elif mime_type in [PPTX_MIME_TYPE, 'application/vnd.google-apps.presentation']:
+        extractor, suffix = extract_chunks_from_pptx, '.pptx'
+    else:
+        content = await download_file_content(access_token, file_id, mime_type)
+        if not content or content.startswith('['):  # Skip error messages
+            return []
+        return chunk_text(content)
+
+    try:
+        service = get_drive_service(access_token)
+        print(f"📁 Processing file with MIME type: {mime_type}")
+
+        if mime_type == 'application/vnd.google-apps.spreadsheet':
+            try:
+                # Export as XLSX rather than CSV so every sheet is included
+                media_request = service.files().export_media(fileId=file_id, mimeType=XLSX_MIME_TYPE)
+                return download_and_extract(media_request, extractor, suffix)
+            except Exception as e:
+                # Drive caps exports at 10 MB; CSV is smaller but only covers the first sheet
+                print(f"⚠️ XLSX export failed, falling back to CSV: {e}")
+                media_request = service.files().export_media(fileId=file_id, mimeType='text/csv')
+                return download_and_extract(media_request, extract_chunks_from_csv, '.csv')
+
+        if mime_type == 'application/vnd.google-apps.presentation':
+            try:
+                # Export as PPTX so text can be split per slide
+                media_request = service.files().export_media(fileId=file_id, mimeType=PPTX_MIME_TYPE)
+                return download_and_extract(media_request, extractor, suffix)
+            except Exception as e:
+                # Decks with many images exceed Drive's 10 MB export cap as PPTX
+                print(f"⚠️ PPTX export failed, falling back to plain text: {e}")
+                content = service.files().export(fileId=file_id, mimeType='text/plain').execute()
+                text = content.decode('utf-8')
+                print(f"✅ Google Slides processed ({len(text)} characters)")
+                return chunk_text(text)
+
+        media_request = service.files().get_media(fileId=file_id)
+        return download_and_extract(media_request, extractor, suffix)
+
+    except Exception as e:
+        print(f"❌ Error downloading file {file_id}: {e}")
+        return []
+
+def import_modules(module_names: List[str]):
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+            prewarm_status["loaded"].append(module_name)
+        except Exception as e:
+            print(f"⚠️ Could not prewarm {module_name}: {e}")
+            prewarm_status["failed"][module_name] = str(e)
+
+def prewarm_imports():
+    """Import heavy modules in the background so requests don't pay for them"""
+    prewarm_status["started"] = True
+    start = time.monotonic()
+    
+    import_modules(CORE_MODULES)
+    prewarm_status["core_ready"] = True
+    print(f"🔥 Core modules loaded in {time.monotonic() - start:.2f}s")
+    
+    if PREWARM_IMPORTS:
+        import_modules(PREWARM_MODULES)
+    
+    prewarm_status["completed"] = True
+    print(f"🔥 Prewarmed {len(prewarm_status['loaded'])} modules in {time.monotonic() - start:.2f}s")
+
 @app.get("/")
 async def root():
     return {"message": "Talk to a Folder API is running"}
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: the server can take traffic.
+
+    Ready once the core modules used on every request are loaded; document
+    extractor prewarm progress is reported for visibility only.
+    """
+    body = {
+        "status": "ready" if prewarm_status["core_ready"] else "starting",
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 3),
+        "prewarm": {
+            "enabled": PREWARM_IMPORTS,
+            "completed": prewarm_status["completed"],
+            "loaded": len(prewarm_status["loaded"]),
+            "failed": list(prewarm_status["failed"]),
+        },
+    }
+    return JSONResponse(body, status_code=200 if prewarm_status["core_ready"] else 503)
+
 @app.post("/auth/google", response_model=AuthResponse)
 async def auth_google(request: AuthRequest):
     print(f"🔐 Received Google auth request")
@@ -548,28 +1147,25 @@ async def index_folder(request: IndexRequest):
         for file in files[:5]:  # Limit to first 5 files for now
             try:
                 print(f"Processing file: {file['name']}")
-                content = await download_file_content(
+                chunks = await extract_file_chunks(
                     request.access_token, 
                     file['id'], 
                     file['mimeType']
                 )
                 
-                if content and not content.startswith('['):  # Skip error messages
-                    chunks = chunk_text(content)
+                for i, chunk in enumerate(chunks):
+                    # Get embedding for each chunk
+                    embedding = await get_embedding(chunk)
                     
-                    for i, chunk in enumerate(chunks):
-                        # Get embedding for each chunk
-                        embedding = await get_embedding(chunk)
-                        
-                        chunk_data = {
-                            "file_name": file['name'],
-                            "file_id": file['id'],
-                            "chunk_id": f"{file['id']}_chunk_{i}",
-                            "text": chunk,
-                            "embedding": embedding,
-                            "mime_type": file['mimeType']
-                        }
-                        document_chunks.append(chunk_data)
+                    chunk_data = {
+                        "file_name": file['name'],
+                        "file_id": file['id'],
+                        "chunk_id": f"{file['id']}_chunk_{i}",
+                        "text": chunk,
+                        "embedding": embedding,
+                        "mime_type": file['mimeType']
+                    }
+                    document_chunks.append(chunk_data)
                         
             except Exception as e:
                 print(f"Error processing file {file['name']}: {e}")
@@ -624,9 +1220,9 @@ async def get_index_status(job_id: str):
     }
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     # Validate access token
-    _ = validate_google_token(request.access_token)
+    user_info = validate_google_token(request.access_token)
     
     # Check if the job exists and is completed
     if request.job_id not in folder_data:
@@ -640,15 +1236,9 @@ async def chat(request: ChatRequest):
         )
     
     try:
-        # Initialize conversation history for this job_id if it doesn't exist
-        if request.job_id not in conversation_history:
-            conversation_history[request.job_id] = []
-        
-        # Add user message to conversation history
-        conversation_history[request.job_id].append({
-            "role": "user",
-            "content": request.message
-        })
+        # Each chat session gets its own history, scoped to the authenticated user
+        conversation_key = conversation_key_for(request.job_id, user_info, request.session_id)
+        conversation = conversation_store.get(conversation_key)
         
         # Use RAG pipeline for intelligent responses
         relevant_chunks = await find_relevant_chunks(request.message, request.job_id)
@@ -661,18 +1251,19 @@ async def chat(request: ChatRequest):
             answer = await generate_answer(
                 request.message, 
                 relevant_chunks, 
-                conversation_history[request.job_id]
+                conversation
             )
         
-        # Add AI response to conversation history
-        conversation_history[request.job_id].append({
-            "role": "assistant",
-            "content": answer
-        })
-        
-        # Keep only last 20 messages (10 exchanges) to prevent memory issues
-        if len(conversation_history[request.job_id]) > 20:
-            conversation_history[request.job_id] = conversation_history[request.job_id][-20:]
+        # Add the exchange to conversation history; the ring buffer drops
+        # the oldest messages, which are folded into the summary in batches
+        conversation.append("user", request.message)
+        conversation.append("assistant", answer)
+        conversation_store.put(conversation_key, conversation)
+        if conversation.needs_summary():
+            # Summarize after the response is sent; pending messages are
+            # still included verbatim in prompts until they are folded in
+            conversation.summarizing = True
+            background_tasks.add_task(summarize_conversation, conversation)
         
         # Create citations from relevant chunks
         citations = []
@@ -687,7 +1278,7 @@ async def chat(request: ChatRequest):
                 })
                 seen_files.add(file_name)
         
-        print(f"💬 Conversation history for {request.job_id}: {len(conversation_history[request.job_id])} messages")
+        print(f"💬 Conversation history for {request.job_id}: {len(conversation.messages)} recent messages, {len(conversation_store)} conversations in memory")
         
         return ChatResponse(answer=answer, citations=citations)
         
@@ -698,24 +1289,48 @@ async def chat(request: ChatRequest):
             citations=[]
         )
 
+def bearer_token(authorization: Optional[str]) -> str:
+    """Extract the Google access token from an Authorization: Bearer header"""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise HTTPException(status_code=401, detail="Missing Authorization: Bearer <access_token> header")
+    return token.strip()
+
+def conversation_key_for(job_id: str, user_info: Dict, session_id: Optional[str]) -> tuple:
+    """Build the conversation store key; clients that don't send a session_id share one default session"""
+    return (job_id, user_info["id"], session_id or DEFAULT_SESSION_ID)
+
 @app.delete("/chat/{job_id}/history")
-async def clear_conversation_history(job_id: str):
-    """Clear conversation history for a specific job_id"""
-    if job_id in conversation_history:
-        del conversation_history[job_id]
+async def clear_conversation_history(job_id: str, session_id: Optional[str] = None, authorization: Optional[str] = Header(None)):
+    """Clear the caller's conversation history for one chat session, or for all their sessions of a job_id"""
+    user_info = validate_google_token(bearer_token(authorization))
+    
+    if session_id:
+        if conversation_store.delete(conversation_key_for(job_id, user_info, session_id)):
+            return {"message": f"Conversation history cleared for session {session_id} of job {job_id}"}
+        return {"message": f"No conversation history found for session {session_id} of job {job_id}"}
+    
+    if conversation_store.delete_user(job_id, user_info["id"]):
         return {"message": f"Conversation history cleared for job {job_id}"}
     return {"message": f"No conversation history found for job {job_id}"}
 
 @app.get("/chat/{job_id}/history")
-async def get_conversation_history(job_id: str):
-    """Get conversation history for a specific job_id (for debugging)"""
-    if job_id in conversation_history:
+async def get_conversation_history(job_id: str, session_id: Optional[str] = None, authorization: Optional[str] = Header(None)):
+    """Get the caller's conversation history for a chat session of a job_id (for debugging)"""
+    user_info = validate_google_token(bearer_token(authorization))
+    session_id = session_id or DEFAULT_SESSION_ID
+    
+    conversation = conversation_store.get(conversation_key_for(job_id, user_info, session_id), create=False)
+    if conversation:
+        messages = conversation.pending + list(conversation.messages)
         return {
             "job_id": job_id,
-            "message_count": len(conversation_history[job_id]),
-            "messages": conversation_history[job_id]
+            "session_id": session_id,
+            "message_count": len(messages),
+            "summary": conversation.summary,
+            "messages": messages
         }
-    return {"job_id": job_id, "message_count": 0, "messages": []}
+    return {"job_id": job_id, "session_id": session_id, "message_count": 0, "summary": "", "messages": []}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend as a plain module, the same way uvicorn loads main:app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,237 @@
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from main import Conversation, ConversationStore
+
+
+@pytest.fixture
+def small_history(monkeypatch):
+    monkeypatch.setattr(main, "HISTORY_MAX_MESSAGES", 4)
+    monkeypatch.setattr(main, "HISTORY_SUMMARY_BATCH", 2)
+    monkeypatch.setattr(main, "HISTORY_SUMMARY_MAX_CHARS", 50)
+
+
+def stub_chat_completion(monkeypatch, reply=None, error=None, during_call=None):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        if during_call:
+            during_call()
+        if error:
+            raise error
+        return {"choices": [{"message": {"content": reply}}]}
+
+    monkeypatch.setattr(main.openai.ChatCompletion, "create", create)
+    return calls
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_conversation(*contents):
+    conversation = Conversation()
+    for content in contents:
+        conversation.append("user", content)
+    return conversation
+
+
+def test_ring_buffer_moves_oldest_messages_to_pending(small_history):
+    conversation = make_conversation("1", "2", "3", "4", "5", "6")
+
+    assert [msg["content"] for msg in conversation.messages] == ["3", "4", "5", "6"]
+    assert [msg["content"] for msg in conversation.pending] == ["1", "2"]
+    assert conversation.needs_summary()
+
+
+def test_summary_folds_pending_messages(small_history, monkeypatch):
+    calls = stub_chat_completion(monkeypatch, reply="  user asked about 1 and 2  ")
+    conversation = make_conversation("1", "2", "3", "4", "5", "6")
+    conversation.summarizing = True
+
+    main.summarize_conversation(conversation)
+
+    assert "user: 1\nuser: 2" in calls[0]["messages"][1]["content"]
+    assert conversation.summary == "user asked about 1 and 2"
+    assert conversation.pending == []
+    assert not conversation.summarizing
+    assert len(conversation.messages) == 4
+
+
+def test_messages_evicted_during_summary_stay_pending(small_history, monkeypatch):
+    conversation = make_conversation("1", "2", "3", "4", "5", "6")
+    stub_chat_completion(monkeypatch, reply="summary", during_call=lambda: conversation.append("user", "7"))
+
+    main.summarize_conversation(conversation)
+
+    assert [msg["content"] for msg in conversation.pending] == ["3"]
+
+
+def test_summary_failure_keeps_trimmed_raw_text(small_history, monkeypatch):
+    stub_chat_completion(monkeypatch, error=RuntimeError("API down"))
+    conversation = make_conversation("a" * 40, "b" * 40, "3", "4", "5", "6")
+    conversation.summarizing = True
+
+    main.summarize_conversation(conversation)
+
+    assert len(conversation.summary) == 50
+    assert conversation.summary.endswith("user: " + "b" * 40)
+    assert conversation.pending == []
+    assert not conversation.summarizing
+
+
+def test_lru_spill_and_reload(tmp_path):
+    store = ConversationStore(max_conversations=2, idle_ttl=3600, disk_dir=str(tmp_path))
+    for session in ["s1", "s2", "s3"]:
+        store.get(("job", "user", session)).append("user", f"hello from {session}")
+
+    assert len(store) == 2
+    spilled_path = store._disk_path(("job", "user", "s1"))
+    # Requests only queue evicted conversations; the disk worker writes them
+    assert not os.path.exists(spilled_path)
+    assert store.flush_spills() == 1
+    assert os.path.exists(spilled_path)
+
+    reloaded = store.get(("job", "user", "s1"), create=False)
+    assert [msg["content"] for msg in reloaded.messages] == ["hello from s1"]
+    assert not os.path.exists(spilled_path)
+    # Reloading s1 pushed out the least recently used conversation, s2
+    store.flush_spills()
+    assert os.path.exists(store._disk_path(("job", "user", "s2")))
+
+
+def test_queued_conversation_is_reclaimed_before_it_is_written(tmp_path):
+    store = ConversationStore(max_conversations=1, idle_ttl=3600, disk_dir=str(tmp_path))
+    store.get(("job", "user", "s1")).append("user", "hello")
+    store.get(("job", "user", "s2"))
+
+    reclaimed = store.get(("job", "user", "s1"), create=False)
+
+    assert [msg["content"] for msg in reclaimed.messages] == ["hello"]
+    store.flush_spills()
+    assert not os.path.exists(store._disk_path(("job", "user", "s1")))
+    assert os.path.exists(store._disk_path(("job", "user", "s2")))
+
+
+def test_lru_eviction_without_disk_drops_conversation():
+    store = ConversationStore(max_conversations=1, idle_ttl=3600)
+    store.get(("job", "user", "s1")).append("user", "hello")
+    store.get(("job", "user", "s2"))
+
+    assert store.get(("job", "user", "s1"), create=False) is None
+
+
+def test_ttl_sweep_evicts_idle_conversations(tmp_path):
+    store = ConversationStore(max_conversations=10, idle_ttl=60, disk_dir=str(tmp_path), sweep_interval=0)
+    idle = store.get(("job", "user", "idle"))
+    idle.append("user", "old message")
+    store.get(("job", "user", "active"))
+    idle.last_active = time.time() - 120
+
+    store.get(("job", "user", "other"))
+    store.flush_spills()
+
+    assert len(store) == 2
+    assert os.path.exists(store._disk_path(("job", "user", "idle")))
+
+
+def test_unreadable_disk_file_is_discarded(tmp_path):
+    store = ConversationStore(max_conversations=10, idle_ttl=3600, disk_dir=str(tmp_path))
+    path = store._disk_path(("job", "user", "s1"))
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write('{"messages": [')
+
+    assert store.get(("job", "user", "s1"), create=False) is None
+    assert not os.path.exists(path)
+
+
+def test_cleanup_disk_removes_expired_files(tmp_path):
+    store = ConversationStore(max_conversations=1, idle_ttl=3600, disk_dir=str(tmp_path), disk_ttl=60)
+    store.get(("job", "user", "old"))
+    store.get(("job", "user", "new"))
+    store.get(("job", "user", "newest"))
+    store.get(("job", "other-user", "s1"))
+    store.get(("job", "user", "latest"))
+    store.flush_spills()
+    old_path = store._disk_path(("job", "user", "old"))
+    other_user_path = store._disk_path(("job", "other-user", "s1"))
+    expired = time.time() - 120
+    for path in [old_path, other_user_path]:
+        os.utime(path, (expired, expired))
+
+    assert store.cleanup_disk() == 2
+    assert not os.path.exists(old_path)
+    assert os.path.exists(store._disk_path(("job", "user", "new")))
+    # Directories left empty are removed too
+    assert not os.path.exists(os.path.dirname(other_user_path))
+    assert os.path.exists(os.path.dirname(old_path))
+
+
+def test_load_tolerates_file_removed_concurrently(tmp_path, monkeypatch):
+    store = ConversationStore(max_conversations=1, idle_ttl=3600, disk_dir=str(tmp_path))
+    store.get(("job", "user", "s1")).append("user", "hello")
+    store.get(("job", "user", "s2"))
+    store.flush_spills()
+    real_remove = os.remove
+
+    def remove_twice(path):
+        # Simulate the disk worker expiring the file between open() and remove()
+        real_remove(path)
+        real_remove(path)
+
+    monkeypatch.setattr(main.os, "remove", remove_twice)
+    reloaded = store.get(("job", "user", "s1"), create=False)
+
+    assert [msg["content"] for msg in reloaded.messages] == ["hello"]
+
+
+def test_history_endpoints_are_scoped_to_the_caller(monkeypatch):
+    monkeypatch.setattr(main, "conversation_store", ConversationStore(max_conversations=10, idle_ttl=3600))
+    monkeypatch.setattr(main, "validate_google_token", lambda token: {"id": token})
+    main.conversation_store.get(("job_1", "alice", "chat_1")).append("user", "private question")
+    client = TestClient(main.app)
+
+    own = client.get("/chat/job_1/history", params={"session_id": "chat_1"}, headers=bearer("alice"))
+    other = client.get("/chat/job_1/history", params={"session_id": "chat_1"}, headers=bearer("bob"))
+    assert own.json()["message_count"] == 1
+    assert other.json()["message_count"] == 0
+
+    client.delete("/chat/job_1/history", headers=bearer("bob"))
+    assert main.conversation_store.get(("job_1", "alice", "chat_1"), create=False) is not None
+
+    client.delete("/chat/job_1/history", headers=bearer("alice"))
+    assert main.conversation_store.get(("job_1", "alice", "chat_1"), create=False) is None
+
+
+def test_history_endpoints_require_a_bearer_token():
+    client = TestClient(main.app)
+
+    assert client.get("/chat/job_1/history").status_code == 401
+    assert client.delete("/chat/job_1/history", headers={"Authorization": "Basic abc"}).status_code == 401
+
+
+def test_chat_summarizes_in_background_after_response(small_history, monkeypatch):
+    monkeypatch.setattr(main, "conversation_store", ConversationStore(max_conversations=10, idle_ttl=3600))
+    monkeypatch.setattr(main, "validate_google_token", lambda token: {"id": token})
+    monkeypatch.setitem(main.folder_data, "job_1", {"status": "completed", "folder_name": "Docs", "files": []})
+
+    async def no_chunks(query, job_id):
+        return []
+
+    monkeypatch.setattr(main, "find_relevant_chunks", no_chunks)
+    stub_chat_completion(monkeypatch, reply="earlier questions")
+    client = TestClient(main.app)
+
+    for message in ["q1", "q2", "q3"]:
+        client.post("/chat", json={"access_token": "alice", "message": message, "job_id": "job_1"})
+
+    conversation = main.conversation_store.get(("job_1", "alice", main.DEFAULT_SESSION_ID), create=False)
+    assert conversation.summary == "earlier questions"
+    assert conversation.pending == []
+    assert len(conversation.messages) == 4
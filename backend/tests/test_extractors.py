@@ -0,0 +1,117 @@
+import pytest
+from openpyxl import Workbook
+from pptx import Presentation
+from pptx.util import Inches
+
+import main
+from main import chunk_rows, extract_chunks_from_csv, extract_chunks_from_pptx, extract_chunks_from_xlsx, format_row
+
+
+def chunk_body(chunk):
+    """Header and row lines of a row-group chunk, without the source label"""
+    return chunk.split("\n", 1)[1]
+
+
+def test_format_row_drops_trailing_empty_cells():
+    assert format_row(["a", None, " b ", "", None]) == "a |  | b"
+
+
+def test_rows_are_grouped_under_the_header(monkeypatch):
+    monkeypatch.setattr(main, "SPREADSHEET_ROWS_PER_CHUNK", 2)
+    rows = [(None, None), ("name", "age"), ("ann", 3), ("bob", 4), (None, None), ("cat", 5)]
+
+    chunks = chunk_rows(rows, "Sheet: People")
+
+    assert chunks == [
+        "Sheet: People (rows 3-4)\nColumns: name | age\nann | 3\nbob | 4",
+        "Sheet: People (rows 6-6)\nColumns: name | age\ncat | 5",
+    ]
+
+
+def test_sheet_with_only_a_header_row():
+    assert chunk_rows([("name", "age")], "Table") == ["Table\nColumns: name | age"]
+
+
+def test_long_row_is_split_within_the_limit():
+    rows = [("name", "bio"), ("ann", "word " * 2000)]
+
+    chunks = chunk_rows(rows, "Table")
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk_body(chunk).startswith("Columns: name | bio\n")
+        assert len(chunk_body(chunk)) <= main.SPREADSHEET_CHUNK_CHARS + len("Columns: \n\n")
+
+
+def test_wide_header_is_truncated():
+    header = [f"column_{i}" for i in range(500)]
+    rows = [header, ["x"] * 500]
+
+    chunks = chunk_rows(rows, "Table")
+
+    header_line = chunk_body(chunks[0]).split("\n")[0]
+    assert header_line.endswith(" ...")
+    assert len(header_line) <= main.SPREADSHEET_CHUNK_CHARS // 2 + len("Columns: ")
+    for chunk in chunks:
+        assert len(chunk_body(chunk)) <= main.SPREADSHEET_CHUNK_CHARS + len("Columns: \n\n")
+
+
+def test_csv_byte_order_mark_is_stripped(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text("name,age\nann,3\n", encoding="utf-8-sig")
+
+    assert extract_chunks_from_csv(str(path)) == ["Table (rows 2-2)\nColumns: name | age\nann | 3"]
+
+
+def test_xlsx_chunks_every_sheet(tmp_path):
+    workbook = Workbook()
+    workbook.active.title = "People"
+    workbook.active.append(["name", "age"])
+    workbook.active.append(["ann", 3])
+    places = workbook.create_sheet("Places")
+    places.append(["city"])
+    places.append(["Oslo"])
+    path = tmp_path / "book.xlsx"
+    workbook.save(path)
+
+    assert extract_chunks_from_xlsx(str(path)) == [
+        "Sheet: People (rows 2-2)\nColumns: name | age\nann | 3",
+        "Sheet: Places (rows 2-2)\nColumns: city\nOslo",
+    ]
+
+
+@pytest.fixture
+def deck_path(tmp_path):
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1)).text_frame.text = "Title in group"
+    table = slide.shapes.add_table(1, 2, Inches(1), Inches(3), Inches(4), Inches(1)).table
+    table.cell(0, 0).text = "c1"
+    table.cell(0, 1).text = "c2"
+    slide.notes_slide.notes_text_frame.text = "speaker notes"
+    presentation.slides.add_slide(presentation.slide_layouts[6])  # Empty slides are skipped
+
+    path = tmp_path / "deck.pptx"
+    presentation.save(path)
+    return str(path)
+
+
+def test_pptx_reads_grouped_shapes_and_notes(deck_path):
+    assert extract_chunks_from_pptx(deck_path) == [
+        "Slide 1: Title in group\nc1 | c2\nNotes: speaker notes"
+    ]
+
+
+def test_pptx_tolerates_shapes_without_recognized_geometry(tmp_path):
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[6])
+    textbox = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1))
+    textbox.text_frame.text = "Still readable"
+    # Without preset geometry python-pptx raises NotImplementedError from shape_type
+    geometry = textbox._element.spPr.prstGeom
+    geometry.getparent().remove(geometry)
+    path = tmp_path / "odd.pptx"
+    presentation.save(path)
+
+    assert extract_chunks_from_pptx(str(path)) == ["Slide 1: Still readable"]
@@ -273,7 +273,8 @@ function App() {
       const response = await axios.post(`${API_BASE}/chat`, {
         access_token: accessToken,
         message: userMessage,
-        job_id: jobId
+        job_id: jobId,
+        session_id: currentChatId
       })
       
       setMessages(prev => [...prev, {